@@ -151,7 +151,7 @@ async def form_bot_agent(trained_formbot: Text) -> Agent:
     return Agent.load(trained_formbot, action_endpoint=endpoint)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def moodbot_features(
     request: Request, moodbot_domain: Domain
 ) -> Dict[Text, Dict[Text, Features]]:
@@ -183,6 +183,6 @@ def moodbot_features(
     return {"intents": intents, "actions": actions}
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def moodbot_tracker(moodbot_domain: Domain) -> DialogueStateTracker:
     return tracker_from_dialogue(TEST_MOODBOT_DIALOGUE, moodbot_domain)
@@ -1,7 +1,21 @@
-from typing import Text, Dict, List, Optional
+from types import MappingProxyType
+from typing import (
+    Callable,
+    Iterable,
+    Mapping,
+    NamedTuple,
+    Sequence,
+    Text,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
 import numpy as np
 import pytest
+import scipy.sparse
 
 from rasa.core.featurizers.single_state_featurizer import SingleStateFeaturizer
 from rasa.core.featurizers.single_state_featurizer import (
@@ -29,6 +43,31 @@ from rasa.utils.tensorflow.constants import LABEL_PAD_ID
 from rasa.utils.tensorflow.model_data import ragged_array_to_ndarray
 from rasa.core.exceptions import InvalidTrackerFeaturizerUsageError
 
+# Read-only featurized state used to describe expected featurizer outputs.
+FrozenState = Mapping[Text, Tuple[Features, ...]]
+# Hashable summary of a featurized state, see `_fingerprint_state`.
+StateFingerprint = Tuple[Tuple[Text, Tuple["FeatureFingerprint", ...]], ...]
+
+
+def _read_only(array: np.ndarray) -> np.ndarray:
+    array.flags.writeable = False
+    return array
+
+
+# Expected label ids, shaped as returned by the featurizers: one row per tracker
+# for the full dialogue featurizer, one row per history for max history ones.
+MOODBOT_DIALOGUE_ACTION_LABELS = _read_only(np.array([[0, 17, 0, 14, 15, 0, 16]]))
+MOODBOT_ACTION_LABELS = _read_only(np.array([[0, 17, 0, 14, 15, 0, 16]]).T)
+MOODBOT_ACTION_LABELS_TWICE = _read_only(np.vstack([MOODBOT_ACTION_LABELS] * 2))
+UNLIKELY_INTENT_DIALOGUE_ACTION_LABELS = _read_only(
+    np.array([[0, 9, 17, 0, 9, 14, 15, 0, 9, 16]])
+)
+UNLIKELY_INTENT_IGNORED_ACTION_LABELS = _read_only(np.array([[0, 17, 0]]).T)
+UNLIKELY_INTENT_KEPT_ACTION_LABELS = _read_only(np.array([[0, 9, 17, 0]]).T)
+MOODBOT_INTENT_LABELS = _read_only(np.array([[5, 7, 3]]).T)
+MOODBOT_INTENT_LABELS_TWICE = _read_only(np.vstack([MOODBOT_INTENT_LABELS] * 2))
+UNLIKELY_INTENT_INTENT_LABELS = _read_only(np.array([[5, 7]]).T)
+
 
 def test_fail_to_load_non_existent_featurizer():
     assert TrackerFeaturizer.load("non_existent_class") is None
@@ -121,32 +160,303 @@ def test_featurize_trackers_raises_on_missing_state_featurizer(domain: Domain):
         tracker_featurizer.featurize_trackers([], domain, precomputations=None)
 
 
+class FeatureFingerprint(NamedTuple):
+    """Hashable summary of a sparse feature, see `_feature_fingerprint`."""
+
+    attribute: Text
+    type: Text
+    origin: Union[Text, Tuple[Text, ...]]
+    shape: Tuple[int, int]
+    data: bytes
+    indices: bytes
+    indptr: bytes
+
+
+def _feature_fingerprint(feature: Features) -> FeatureFingerprint:
+    """Builds a hashable fingerprint of a sparse feature.
+
+    The matrix stays in compressed form: it is converted to canonical CSR
+    (duplicates summed, explicit zeros dropped, indices sorted) and only its
+    underlying buffers are compared, so no dense copy is ever created. The
+    matrix is copied first, as canonicalising works in place and must not
+    modify the (possibly shared) input features.
+    """
+    matrix = scipy.sparse.csr_matrix(feature.features, dtype=np.float64, copy=True)
+    matrix.eliminate_zeros()
+    matrix.sort_indices()
+    origin = feature.origin
+    if isinstance(origin, list):
+        origin = tuple(origin)
+    return FeatureFingerprint(
+        feature.attribute,
+        feature.type,
+        origin,
+        matrix.shape,
+        matrix.data.tobytes(),
+        matrix.indices.astype(np.int64).tobytes(),
+        matrix.indptr.astype(np.int64).tobytes(),
+    )
+
+
+def _fingerprint_state(state: Mapping[Text, Sequence[Features]]) -> StateFingerprint:
+    return tuple(
+        sorted(
+            (key, tuple(_feature_fingerprint(feature) for feature in features))
+            for key, features in state.items()
+        )
+    )
+
+
+def _fingerprint_states(
+    states: Sequence[Mapping[Text, Sequence[Features]]]
+) -> Tuple[StateFingerprint, ...]:
+    """Fingerprints featurized states so that they can be compared with `==`."""
+    return tuple(_fingerprint_state(state) for state in states)
+
+
 def compare_featurized_states(
-    states1: List[Dict[Text, List[Features]]], states2: List[Dict[Text, List[Features]]]
+    states1: Sequence[Mapping[Text, Sequence[Features]]],
+    states2: Sequence[Mapping[Text, Sequence[Features]]],
 ) -> bool:
     """Compares two lists of featurized states and returns True if they
     are identical and False otherwise.
     """
 
+    if states1 is states2:
+        return True
     if len(states1) != len(states2):
         return False
 
     for state1, state2 in zip(states1, states2):
-        if state1.keys() != state2.keys():
+        if state1 is state2:
+            continue
+        keys = state1.keys()
+        if keys != state2.keys():
             return False
-        for key in state1.keys():
-            for feature1, feature2 in zip(state1[key], state2[key]):
-                if np.any((feature1.features != feature2.features).toarray()):
-                    return False
-                if feature1.origin != feature2.origin:
-                    return False
-                if feature1.attribute != feature2.attribute:
-                    return False
-                if feature1.type != feature2.type:
-                    return False
+        for key in keys:
+            features1 = state1[key]
+            features2 = state2[key]
+            if features1 is features2:
+                continue
+            if len(features1) != len(features2):
+                return False
+            fingerprints1 = [_feature_fingerprint(f) for f in features1]
+            fingerprints2 = [_feature_fingerprint(f) for f in features2]
+            if fingerprints1 != fingerprints2:
+                return False
     return True
 
 
+def compare_featurized_trackers(
+    trackers1: Sequence[Sequence[Mapping[Text, Sequence[Features]]]],
+    trackers2: Sequence[Sequence[Mapping[Text, Sequence[Features]]]],
+) -> bool:
+    """Compares the featurized states of several trackers and returns True if they
+    are identical and False otherwise.
+    """
+    if len(trackers1) != len(trackers2):
+        return False
+
+    return all(
+        compare_featurized_states(states1, states2)
+        for states1, states2 in zip(trackers1, trackers2)
+    )
+
+
+def _frozen_states(
+    states: Iterable[Dict[Text, List[Features]]]
+) -> Tuple[FrozenState, ...]:
+    """Converts featurized states into read-only states with tuples of features."""
+    return tuple(
+        MappingProxyType({key: tuple(features) for key, features in state.items()})
+        for state in states
+    )
+
+
+def _max_history_prefixes(
+    states: Tuple[FrozenState, ...]
+) -> Tuple[Tuple[FrozenState, ...], ...]:
+    """Returns the featurized histories a max history featurizer creates for the
+    bot actions following each of the given `states`, before any truncation.
+    """
+    return tuple(states[: index + 1] for index in range(len(states)))
+
+
+def _moodbot_states(
+    moodbot_features: Dict[Text, Dict[Text, Features]]
+) -> Tuple[FrozenState, ...]:
+    return _frozen_states(
+        (
+            {},
+            {
+                ACTION_NAME: [moodbot_features["actions"][ACTION_LISTEN_NAME]],
+                INTENT: [moodbot_features["intents"]["greet"]],
+            },
+            {ACTION_NAME: [moodbot_features["actions"]["utter_greet"]]},
+            {
+                ACTION_NAME: [moodbot_features["actions"][ACTION_LISTEN_NAME]],
+                INTENT: [moodbot_features["intents"]["mood_unhappy"]],
+            },
+            {ACTION_NAME: [moodbot_features["actions"]["utter_cheer_up"]]},
+            {ACTION_NAME: [moodbot_features["actions"]["utter_did_that_help"]]},
+            {
+                ACTION_NAME: [moodbot_features["actions"][ACTION_LISTEN_NAME]],
+                INTENT: [moodbot_features["intents"]["deny"]],
+            },
+        )
+    )
+
+
+def _action_unlikely_intent_ignored_states(
+    moodbot_features: Dict[Text, Dict[Text, Features]]
+) -> Tuple[FrozenState, ...]:
+    return _frozen_states(
+        (
+            {},
+            {
+                ACTION_NAME: [moodbot_features["actions"][ACTION_LISTEN_NAME]],
+                INTENT: [moodbot_features["intents"]["greet"]],
+            },
+            {ACTION_NAME: [moodbot_features["actions"]["utter_greet"]]},
+        )
+    )
+
+
+def _action_unlikely_intent_kept_states(
+    moodbot_features: Dict[Text, Dict[Text, Features]]
+) -> Tuple[FrozenState, ...]:
+    return _frozen_states(
+        (
+            {},
+            {
+                ACTION_NAME: [moodbot_features["actions"][ACTION_LISTEN_NAME]],
+                INTENT: [moodbot_features["intents"]["greet"]],
+            },
+            {ACTION_NAME: [moodbot_features["actions"][ACTION_UNLIKELY_INTENT_NAME]]},
+            {ACTION_NAME: [moodbot_features["actions"]["utter_greet"]]},
+        )
+    )
+
+
+@pytest.fixture(scope="session")
+def unlikely_intent_tracker_short(moodbot_domain: Domain) -> DialogueStateTracker:
+    """Moodbot tracker with an `action_unlikely_intent` after the first user turn.
+
+    The tracker is shared between tests and must not be modified.
+    """
+    return DialogueStateTracker.from_events(
+        "default",
+        [
+            ActionExecuted(ACTION_LISTEN_NAME),
+            user_uttered("greet"),
+            ActionExecuted(ACTION_UNLIKELY_INTENT_NAME),
+            ActionExecuted("utter_greet"),
+            ActionExecuted(ACTION_LISTEN_NAME),
+            user_uttered("mood_unhappy"),
+        ],
+        domain=moodbot_domain,
+    )
+
+
+@pytest.fixture(scope="session")
+def unlikely_intent_tracker_long(moodbot_domain: Domain) -> DialogueStateTracker:
+    """Moodbot tracker with an `action_unlikely_intent` after the first two user
+    turns.
+
+    The tracker is shared between tests and must not be modified.
+    """
+    return DialogueStateTracker.from_events(
+        "default",
+        [
+            ActionExecuted(ACTION_LISTEN_NAME),
+            user_uttered("greet"),
+            ActionExecuted(ACTION_UNLIKELY_INTENT_NAME),
+            ActionExecuted("utter_greet"),
+            ActionExecuted(ACTION_LISTEN_NAME),
+            user_uttered("mood_great"),
+            ActionExecuted(ACTION_UNLIKELY_INTENT_NAME),
+            ActionExecuted("utter_happy"),
+            ActionExecuted(ACTION_LISTEN_NAME),
+            user_uttered("goodbye"),
+        ],
+        domain=moodbot_domain,
+    )
+
+
+def _max_history_fingerprints(
+    states: Tuple[FrozenState, ...]
+) -> Tuple[Tuple[StateFingerprint, ...], ...]:
+    return tuple(
+        _fingerprint_states(history) for history in _max_history_prefixes(states)
+    )
+
+
+class MaxHistoryScenario(NamedTuple):
+    """Tracker featurized by a max history featurizer and the expected output."""
+
+    tracker: DialogueStateTracker
+    ignore_action_unlikely_intent: bool
+    expected_fingerprints: Tuple[Tuple[StateFingerprint, ...], ...]
+    expected_labels: np.ndarray
+
+
+@pytest.fixture(scope="session")
+def max_history_scenarios(
+    moodbot_tracker: DialogueStateTracker,
+    unlikely_intent_tracker_short: DialogueStateTracker,
+    moodbot_features: Dict[Text, Dict[Text, Features]],
+) -> Dict[Text, MaxHistoryScenario]:
+    """Max history featurizer scenarios by id, before any `max_history` slicing."""
+    return {
+        "moodbot": MaxHistoryScenario(
+            moodbot_tracker,
+            False,
+            _max_history_fingerprints(_moodbot_states(moodbot_features)),
+            MOODBOT_ACTION_LABELS,
+        ),
+        "ignore_action_unlikely_intent": MaxHistoryScenario(
+            unlikely_intent_tracker_short,
+            True,
+            _max_history_fingerprints(
+                _action_unlikely_intent_ignored_states(moodbot_features)
+            ),
+            UNLIKELY_INTENT_IGNORED_ACTION_LABELS,
+        ),
+        "keep_action_unlikely_intent": MaxHistoryScenario(
+            unlikely_intent_tracker_short,
+            False,
+            _max_history_fingerprints(
+                _action_unlikely_intent_kept_states(moodbot_features)
+            ),
+            UNLIKELY_INTENT_KEPT_ACTION_LABELS,
+        ),
+    }
+
+
+@pytest.fixture
+def make_tracker_featurizer() -> Callable[
+    [Optional[int], bool], MaxHistoryTrackerFeaturizer
+]:
+    """Hands out one `MaxHistoryTrackerFeaturizer` per
+    `(max_history, remove_duplicates)` combination within a test.
+    """
+    featurizers: Dict[Tuple[Optional[int], bool], MaxHistoryTrackerFeaturizer] = {}
+
+    def _featurizer(
+        max_history: Optional[int], remove_duplicates: bool = True
+    ) -> MaxHistoryTrackerFeaturizer:
+        key = (max_history, remove_duplicates)
+        if key not in featurizers:
+            featurizers[key] = MaxHistoryTrackerFeaturizer(
+                SingleStateFeaturizer(),
+                max_history=max_history,
+                remove_duplicates=remove_duplicates,
+            )
+        return featurizers[key]
+
+    return _featurizer
+
+
 def test_featurize_trackers_with_full_dialogue_tracker_featurizer(
     moodbot_tracker: DialogueStateTracker,
     moodbot_domain: Domain,
@@ -181,19 +491,16 @@ def test_featurize_trackers_with_full_dialogue_tracker_featurizer(
     ]
 
     assert actual_features is not None
-    assert len(actual_features) == len(expected_features)
+    assert compare_featurized_trackers(actual_features, expected_features)
 
-    for actual, expected in zip(actual_features, expected_features):
-        assert compare_featurized_states(actual, expected)
-
-    expected_labels = np.array([[0, 17, 0, 14, 15, 0, 16]])
+    expected_labels = MOODBOT_DIALOGUE_ACTION_LABELS
     assert actual_labels is not None
     assert len(actual_labels) == 1
     for actual, expected in zip(actual_labels, expected_labels):
         assert np.all(actual == expected)
 
     # moodbot doesn't contain e2e entities
-    assert not any([any(turn_tags) for turn_tags in entity_tags])
+    assert not any(any(turn_tags) for turn_tags in entity_tags)
 
 
 def test_trackers_ignore_action_unlikely_intent_with_full_dialogue_tracker_featurizer(
@@ -250,19 +557,16 @@ def test_trackers_ignore_action_unlikely_intent_with_full_dialogue_tracker_featu
     ]
 
     assert actual_features is not None
-    assert len(actual_features) == len(expected_features)
-
-    for actual, expected in zip(actual_features, expected_features):
-        assert compare_featurized_states(actual, expected)
+    assert compare_featurized_trackers(actual_features, expected_features)
 
-    expected_labels = np.array([[0, 17, 0, 14, 15, 0, 16]])
+    expected_labels = MOODBOT_DIALOGUE_ACTION_LABELS
     assert actual_labels is not None
     assert len(actual_labels) == 1
     for actual, expected in zip(actual_labels, expected_labels):
         assert np.all(actual == expected)
 
     # moodbot doesn't contain e2e entities
-    assert not any([any(turn_tags) for turn_tags in entity_tags])
+    assert not any(any(turn_tags) for turn_tags in entity_tags)
 
 
 def test_trackers_keep_action_unlikely_intent_with_full_dialogue_tracker_featurizer(
@@ -319,19 +623,16 @@ def test_trackers_keep_action_unlikely_intent_with_full_dialogue_tracker_featuri
     ]
 
     assert actual_features is not None
-    assert len(actual_features) == len(expected_features)
+    assert compare_featurized_trackers(actual_features, expected_features)
 
-    for actual, expected in zip(actual_features, expected_features):
-        assert compare_featurized_states(actual, expected)
-
-    expected_labels = np.array([[0, 9, 17, 0, 9, 14, 15, 0, 9, 16]])
+    expected_labels = UNLIKELY_INTENT_DIALOGUE_ACTION_LABELS
     assert actual_labels is not None
     assert len(actual_labels) == 1
     for actual, expected in zip(actual_labels, expected_labels):
         assert np.all(actual == expected)
 
     # moodbot doesn't contain e2e entities
-    assert not any([any(turn_tags) for turn_tags in entity_tags])
+    assert not any(any(turn_tags) for turn_tags in entity_tags)
 
 
 def test_create_state_features_full_dialogue_tracker_featurizer(
@@ -369,37 +670,19 @@ def test_create_state_features_full_dialogue_tracker_featurizer(
     ]
 
     assert actual_features is not None
-    assert len(actual_features) == len(expected_features)
-
-    for actual, expected in zip(actual_features, expected_features):
-        assert compare_featurized_states(actual, expected)
+    assert compare_featurized_trackers(actual_features, expected_features)
 
 
 def test_state_features_ignore_action_unlikely_intent_full_dialogue_tracker_featurizer(
-    moodbot_domain: Domain, moodbot_features: Dict[Text, Dict[Text, Features]]
+    moodbot_domain: Domain,
+    unlikely_intent_tracker_long: DialogueStateTracker,
+    moodbot_features: Dict[Text, Dict[Text, Features]],
 ):
-    tracker = DialogueStateTracker.from_events(
-        "default",
-        [
-            ActionExecuted(ACTION_LISTEN_NAME),
-            user_uttered("greet"),
-            ActionExecuted(ACTION_UNLIKELY_INTENT_NAME),
-            ActionExecuted("utter_greet"),
-            ActionExecuted(ACTION_LISTEN_NAME),
-            user_uttered("mood_great"),
-            ActionExecuted(ACTION_UNLIKELY_INTENT_NAME),
-            ActionExecuted("utter_happy"),
-            ActionExecuted(ACTION_LISTEN_NAME),
-            user_uttered("goodbye"),
-        ],
-        domain=moodbot_domain,
-    )
-
     state_featurizer = SingleStateFeaturizer()
     tracker_featurizer = FullDialogueTrackerFeaturizer(state_featurizer)
     state_featurizer.prepare_for_training(moodbot_domain)
     actual_features = tracker_featurizer.create_state_features(
-        [tracker],
+        [unlikely_intent_tracker_long],
         moodbot_domain,
         precomputations=None,
         ignore_action_unlikely_intent=True,
@@ -426,37 +709,19 @@ def test_state_features_ignore_action_unlikely_intent_full_dialogue_tracker_feat
     ]
 
     assert actual_features is not None
-    assert len(actual_features) == len(expected_features)
-
-    for actual, expected in zip(actual_features, expected_features):
-        assert compare_featurized_states(actual, expected)
+    assert compare_featurized_trackers(actual_features, expected_features)
 
 
 def test_state_features_keep_action_unlikely_intent_full_dialogue_tracker_featurizer(
-    moodbot_domain: Domain, moodbot_features: Dict[Text, Dict[Text, Features]]
+    moodbot_domain: Domain,
+    unlikely_intent_tracker_long: DialogueStateTracker,
+    moodbot_features: Dict[Text, Dict[Text, Features]],
 ):
-    tracker = DialogueStateTracker.from_events(
-        "default",
-        [
-            ActionExecuted(ACTION_LISTEN_NAME),
-            user_uttered("greet"),
-            ActionExecuted(ACTION_UNLIKELY_INTENT_NAME),
-            ActionExecuted("utter_greet"),
-            ActionExecuted(ACTION_LISTEN_NAME),
-            user_uttered("mood_great"),
-            ActionExecuted(ACTION_UNLIKELY_INTENT_NAME),
-            ActionExecuted("utter_happy"),
-            ActionExecuted(ACTION_LISTEN_NAME),
-            user_uttered("goodbye"),
-        ],
-        domain=moodbot_domain,
-    )
-
     state_featurizer = SingleStateFeaturizer()
     tracker_featurizer = FullDialogueTrackerFeaturizer(state_featurizer)
     state_featurizer.prepare_for_training(moodbot_domain)
     actual_features = tracker_featurizer.create_state_features(
-        [tracker], moodbot_domain, precomputations=None
+        [unlikely_intent_tracker_long], moodbot_domain, precomputations=None
     )
 
     expected_features = [
@@ -482,10 +747,7 @@ def test_state_features_keep_action_unlikely_intent_full_dialogue_tracker_featur
     ]
 
     assert actual_features is not None
-    assert len(actual_features) == len(expected_features)
-
-    for actual, expected in zip(actual_features, expected_features):
-        assert compare_featurized_states(actual, expected)
+    assert compare_featurized_trackers(actual_features, expected_features)
 
 
 def test_prediction_states_with_full_dialogue_tracker_featurizer(
@@ -614,29 +876,15 @@ def test_prediction_states_hide_rule_states_with_full_dialogue_tracker_featurize
 
 def test_prediction_states_ignore_action_intent_unlikely_full_dialogue_featurizer(
     moodbot_domain: Domain,
+    unlikely_intent_tracker_long: DialogueStateTracker,
 ):
     state_featurizer = SingleStateFeaturizer()
     tracker_featurizer = FullDialogueTrackerFeaturizer(state_featurizer)
 
-    tracker = DialogueStateTracker.from_events(
-        "default",
-        [
-            ActionExecuted(ACTION_LISTEN_NAME),
-            user_uttered("greet"),
-            ActionExecuted(ACTION_UNLIKELY_INTENT_NAME),
-            ActionExecuted("utter_greet"),
-            ActionExecuted(ACTION_LISTEN_NAME),
-            user_uttered("mood_great"),
-            ActionExecuted(ACTION_UNLIKELY_INTENT_NAME),
-            ActionExecuted("utter_happy"),
-            ActionExecuted(ACTION_LISTEN_NAME),
-            user_uttered("goodbye"),
-        ],
-        domain=moodbot_domain,
-    )
-
     actual_states = tracker_featurizer.prediction_states(
-        [tracker], moodbot_domain, ignore_action_unlikely_intent=True
+        [unlikely_intent_tracker_long],
+        moodbot_domain,
+        ignore_action_unlikely_intent=True,
     )
 
     expected_states = [
@@ -671,29 +919,15 @@ def test_prediction_states_ignore_action_intent_unlikely_full_dialogue_featurize
 
 def test_prediction_states_keeps_action_intent_unlikely_full_dialogue_featurizer(
     moodbot_domain: Domain,
+    unlikely_intent_tracker_long: DialogueStateTracker,
 ):
     state_featurizer = SingleStateFeaturizer()
     tracker_featurizer = FullDialogueTrackerFeaturizer(state_featurizer)
 
-    tracker = DialogueStateTracker.from_events(
-        "default",
-        [
-            ActionExecuted(ACTION_LISTEN_NAME),
-            user_uttered("greet"),
-            ActionExecuted(ACTION_UNLIKELY_INTENT_NAME),
-            ActionExecuted("utter_greet"),
-            ActionExecuted(ACTION_LISTEN_NAME),
-            user_uttered("mood_great"),
-            ActionExecuted(ACTION_UNLIKELY_INTENT_NAME),
-            ActionExecuted("utter_happy"),
-            ActionExecuted(ACTION_LISTEN_NAME),
-            user_uttered("goodbye"),
-        ],
-        domain=moodbot_domain,
+    actual_states = tracker_featurizer.prediction_states(
+        [unlikely_intent_tracker_long], moodbot_domain
     )
 
-    actual_states = tracker_featurizer.prediction_states([tracker], moodbot_domain)
-
     expected_states = [
         [
             {},
@@ -719,388 +953,103 @@ def test_prediction_states_keeps_action_intent_unlikely_full_dialogue_featurizer
                 PREVIOUS_ACTION: {ACTION_NAME: "utter_happy"},
             },
             {
-                PREVIOUS_ACTION: {ACTION_NAME: ACTION_LISTEN_NAME},
-                USER: {INTENT: "goodbye"},
-            },
-        ]
-    ]
-
-    assert actual_states is not None
-    assert len(actual_states) == len(expected_states)
-
-    for actual, expected in zip(actual_states, expected_states):
-        assert actual == expected
-
-
-@pytest.mark.parametrize("max_history", [None, 2])
-def test_featurize_trackers_with_max_history_tracker_featurizer(
-    moodbot_tracker: DialogueStateTracker,
-    moodbot_domain: Domain,
-    moodbot_features: Dict[Text, Dict[Text, Features]],
-    max_history: Optional[int],
-):
-    state_featurizer = SingleStateFeaturizer()
-    tracker_featurizer = MaxHistoryTrackerFeaturizer(
-        state_featurizer, max_history=max_history
-    )
-
-    actual_features, actual_labels, entity_tags = tracker_featurizer.featurize_trackers(
-        [moodbot_tracker], moodbot_domain, precomputations=None
-    )
-
-    expected_features = [
-        [{}],
-        [
-            {},
-            {
-                ACTION_NAME: [moodbot_features["actions"][ACTION_LISTEN_NAME]],
-                INTENT: [moodbot_features["intents"]["greet"]],
-            },
-        ],
-        [
-            {},
-            {
-                ACTION_NAME: [moodbot_features["actions"][ACTION_LISTEN_NAME]],
-                INTENT: [moodbot_features["intents"]["greet"]],
-            },
-            {ACTION_NAME: [moodbot_features["actions"]["utter_greet"]]},
-        ],
-        [
-            {},
-            {
-                ACTION_NAME: [moodbot_features["actions"][ACTION_LISTEN_NAME]],
-                INTENT: [moodbot_features["intents"]["greet"]],
-            },
-            {ACTION_NAME: [moodbot_features["actions"]["utter_greet"]]},
-            {
-                ACTION_NAME: [moodbot_features["actions"][ACTION_LISTEN_NAME]],
-                INTENT: [moodbot_features["intents"]["mood_unhappy"]],
-            },
-        ],
-        [
-            {},
-            {
-                ACTION_NAME: [moodbot_features["actions"][ACTION_LISTEN_NAME]],
-                INTENT: [moodbot_features["intents"]["greet"]],
-            },
-            {ACTION_NAME: [moodbot_features["actions"]["utter_greet"]]},
-            {
-                ACTION_NAME: [moodbot_features["actions"][ACTION_LISTEN_NAME]],
-                INTENT: [moodbot_features["intents"]["mood_unhappy"]],
-            },
-            {ACTION_NAME: [moodbot_features["actions"]["utter_cheer_up"]]},
-        ],
-        [
-            {},
-            {
-                ACTION_NAME: [moodbot_features["actions"][ACTION_LISTEN_NAME]],
-                INTENT: [moodbot_features["intents"]["greet"]],
-            },
-            {ACTION_NAME: [moodbot_features["actions"]["utter_greet"]]},
-            {
-                ACTION_NAME: [moodbot_features["actions"][ACTION_LISTEN_NAME]],
-                INTENT: [moodbot_features["intents"]["mood_unhappy"]],
-            },
-            {ACTION_NAME: [moodbot_features["actions"]["utter_cheer_up"]]},
-            {ACTION_NAME: [moodbot_features["actions"]["utter_did_that_help"]]},
-        ],
-        [
-            {},
-            {
-                ACTION_NAME: [moodbot_features["actions"][ACTION_LISTEN_NAME]],
-                INTENT: [moodbot_features["intents"]["greet"]],
-            },
-            {ACTION_NAME: [moodbot_features["actions"]["utter_greet"]]},
-            {
-                ACTION_NAME: [moodbot_features["actions"][ACTION_LISTEN_NAME]],
-                INTENT: [moodbot_features["intents"]["mood_unhappy"]],
-            },
-            {ACTION_NAME: [moodbot_features["actions"]["utter_cheer_up"]]},
-            {ACTION_NAME: [moodbot_features["actions"]["utter_did_that_help"]]},
-            {
-                ACTION_NAME: [moodbot_features["actions"][ACTION_LISTEN_NAME]],
-                INTENT: [moodbot_features["intents"]["deny"]],
-            },
-        ],
-    ]
-    if max_history is not None:
-        expected_features = [x[-max_history:] for x in expected_features]
-
-    assert actual_features is not None
-    assert len(actual_features) == len(expected_features)
-
-    for actual, expected in zip(actual_features, expected_features):
-        assert compare_featurized_states(actual, expected)
-
-    expected_labels = np.array([[0, 17, 0, 14, 15, 0, 16]]).T
-
-    assert actual_labels is not None
-    assert actual_labels.shape == expected_labels.shape
-    assert np.all(actual_labels == expected_labels)
-
-    # moodbot doesn't contain e2e entities
-    assert not any([any(turn_tags) for turn_tags in entity_tags])
-
-
-@pytest.mark.parametrize("max_history", [None, 2])
-def test_featurize_trackers_ignore_action_unlikely_intent_max_history_featurizer(
-    moodbot_domain: Domain,
-    moodbot_features: Dict[Text, Dict[Text, Features]],
-    max_history: Optional[int],
-):
-    tracker = DialogueStateTracker.from_events(
-        "default",
-        [
-            ActionExecuted(ACTION_LISTEN_NAME),
-            user_uttered("greet"),
-            ActionExecuted(ACTION_UNLIKELY_INTENT_NAME),
-            ActionExecuted("utter_greet"),
-            ActionExecuted(ACTION_LISTEN_NAME),
-            user_uttered("mood_unhappy"),
-        ],
-        domain=moodbot_domain,
-    )
-    state_featurizer = SingleStateFeaturizer()
-    tracker_featurizer = MaxHistoryTrackerFeaturizer(
-        state_featurizer, max_history=max_history
-    )
-
-    actual_features, actual_labels, entity_tags = tracker_featurizer.featurize_trackers(
-        [tracker],
-        moodbot_domain,
-        precomputations=None,
-        ignore_action_unlikely_intent=True,
-    )
-
-    expected_features = [
-        [{}],
-        [
-            {},
-            {
-                ACTION_NAME: [moodbot_features["actions"][ACTION_LISTEN_NAME]],
-                INTENT: [moodbot_features["intents"]["greet"]],
-            },
-        ],
-        [
-            {},
-            {
-                ACTION_NAME: [moodbot_features["actions"][ACTION_LISTEN_NAME]],
-                INTENT: [moodbot_features["intents"]["greet"]],
-            },
-            {ACTION_NAME: [moodbot_features["actions"]["utter_greet"]]},
-        ],
-    ]
-    if max_history is not None:
-        expected_features = [x[-max_history:] for x in expected_features]
-
-    assert actual_features is not None
-    assert len(actual_features) == len(expected_features)
-
-    for actual, expected in zip(actual_features, expected_features):
-        assert compare_featurized_states(actual, expected)
-
-    expected_labels = np.array([[0, 17, 0]]).T
-    assert actual_labels.shape == expected_labels.shape
-    for actual, expected in zip(actual_labels, expected_labels):
-        assert np.all(actual == expected)
-
-    # moodbot doesn't contain e2e entities
-    assert not any([any(turn_tags) for turn_tags in entity_tags])
-
-
-@pytest.mark.parametrize("max_history", [None, 2])
-def test_featurize_trackers_keep_action_unlikely_intent_max_history_featurizer(
-    moodbot_domain: Domain,
-    moodbot_features: Dict[Text, Dict[Text, Features]],
-    max_history: Optional[int],
-):
-    tracker = DialogueStateTracker.from_events(
-        "default",
-        [
-            ActionExecuted(ACTION_LISTEN_NAME),
-            user_uttered("greet"),
-            ActionExecuted(ACTION_UNLIKELY_INTENT_NAME),
-            ActionExecuted("utter_greet"),
-            ActionExecuted(ACTION_LISTEN_NAME),
-            user_uttered("mood_unhappy"),
-        ],
-        domain=moodbot_domain,
-    )
-    state_featurizer = SingleStateFeaturizer()
-    tracker_featurizer = MaxHistoryTrackerFeaturizer(
-        state_featurizer, max_history=max_history
-    )
-
-    actual_features, actual_labels, entity_tags = tracker_featurizer.featurize_trackers(
-        [tracker], moodbot_domain, precomputations=None
-    )
-
-    expected_features = [
-        [{}],
-        [
-            {},
-            {
-                ACTION_NAME: [moodbot_features["actions"][ACTION_LISTEN_NAME]],
-                INTENT: [moodbot_features["intents"]["greet"]],
-            },
-        ],
-        [
-            {},
-            {
-                ACTION_NAME: [moodbot_features["actions"][ACTION_LISTEN_NAME]],
-                INTENT: [moodbot_features["intents"]["greet"]],
-            },
-            {ACTION_NAME: [moodbot_features["actions"][ACTION_UNLIKELY_INTENT_NAME]]},
-        ],
-        [
-            {},
-            {
-                ACTION_NAME: [moodbot_features["actions"][ACTION_LISTEN_NAME]],
-                INTENT: [moodbot_features["intents"]["greet"]],
-            },
-            {ACTION_NAME: [moodbot_features["actions"][ACTION_UNLIKELY_INTENT_NAME]]},
-            {ACTION_NAME: [moodbot_features["actions"]["utter_greet"]]},
-        ],
-    ]
-    if max_history is not None:
-        expected_features = [x[-max_history:] for x in expected_features]
-
-    assert actual_features is not None
-    assert len(actual_features) == len(expected_features)
-
-    for actual, expected in zip(actual_features, expected_features):
-        assert compare_featurized_states(actual, expected)
-
-    expected_labels = np.array([[0, 9, 17, 0]]).T
-    assert actual_labels is not None
-    assert actual_labels.shape == expected_labels.shape
-    for actual, expected in zip(actual_labels, expected_labels):
-        assert np.all(actual == expected)
-
-    # moodbot doesn't contain e2e entities
-    assert not any([any(turn_tags) for turn_tags in entity_tags])
-
-
-@pytest.mark.parametrize(
-    "remove_duplicates,max_history",
-    [[True, None], [True, 2], [False, None], [False, 2]],
-)
-def test_deduplicate_featurize_trackers_with_max_history_tracker_featurizer(
-    moodbot_tracker: DialogueStateTracker,
-    moodbot_domain: Domain,
-    moodbot_features: Dict[Text, Dict[Text, Features]],
-    remove_duplicates: bool,
-    max_history: Optional[int],
-):
-    state_featurizer = SingleStateFeaturizer()
-    tracker_featurizer = MaxHistoryTrackerFeaturizer(
-        state_featurizer, max_history=max_history, remove_duplicates=remove_duplicates
-    )
-
-    # Add Duplicate moodbot_tracker states should get removed.
-    actual_features, actual_labels, entity_tags = tracker_featurizer.featurize_trackers(
-        [moodbot_tracker, moodbot_tracker], moodbot_domain, precomputations=None
-    )
-
-    expected_features = [
-        [{}],
-        [
-            {},
-            {
-                ACTION_NAME: [moodbot_features["actions"][ACTION_LISTEN_NAME]],
-                INTENT: [moodbot_features["intents"]["greet"]],
-            },
-        ],
-        [
-            {},
-            {
-                ACTION_NAME: [moodbot_features["actions"][ACTION_LISTEN_NAME]],
-                INTENT: [moodbot_features["intents"]["greet"]],
-            },
-            {ACTION_NAME: [moodbot_features["actions"]["utter_greet"]]},
-        ],
-        [
-            {},
-            {
-                ACTION_NAME: [moodbot_features["actions"][ACTION_LISTEN_NAME]],
-                INTENT: [moodbot_features["intents"]["greet"]],
-            },
-            {ACTION_NAME: [moodbot_features["actions"]["utter_greet"]]},
-            {
-                ACTION_NAME: [moodbot_features["actions"][ACTION_LISTEN_NAME]],
-                INTENT: [moodbot_features["intents"]["mood_unhappy"]],
-            },
-        ],
-        [
-            {},
-            {
-                ACTION_NAME: [moodbot_features["actions"][ACTION_LISTEN_NAME]],
-                INTENT: [moodbot_features["intents"]["greet"]],
-            },
-            {ACTION_NAME: [moodbot_features["actions"]["utter_greet"]]},
-            {
-                ACTION_NAME: [moodbot_features["actions"][ACTION_LISTEN_NAME]],
-                INTENT: [moodbot_features["intents"]["mood_unhappy"]],
-            },
-            {ACTION_NAME: [moodbot_features["actions"]["utter_cheer_up"]]},
-        ],
-        [
-            {},
-            {
-                ACTION_NAME: [moodbot_features["actions"][ACTION_LISTEN_NAME]],
-                INTENT: [moodbot_features["intents"]["greet"]],
-            },
-            {ACTION_NAME: [moodbot_features["actions"]["utter_greet"]]},
-            {
-                ACTION_NAME: [moodbot_features["actions"][ACTION_LISTEN_NAME]],
-                INTENT: [moodbot_features["intents"]["mood_unhappy"]],
-            },
-            {ACTION_NAME: [moodbot_features["actions"]["utter_cheer_up"]]},
-            {ACTION_NAME: [moodbot_features["actions"]["utter_did_that_help"]]},
-        ],
-        [
-            {},
-            {
-                ACTION_NAME: [moodbot_features["actions"][ACTION_LISTEN_NAME]],
-                INTENT: [moodbot_features["intents"]["greet"]],
-            },
-            {ACTION_NAME: [moodbot_features["actions"]["utter_greet"]]},
-            {
-                ACTION_NAME: [moodbot_features["actions"][ACTION_LISTEN_NAME]],
-                INTENT: [moodbot_features["intents"]["mood_unhappy"]],
-            },
-            {ACTION_NAME: [moodbot_features["actions"]["utter_cheer_up"]]},
-            {ACTION_NAME: [moodbot_features["actions"]["utter_did_that_help"]]},
-            {
-                ACTION_NAME: [moodbot_features["actions"][ACTION_LISTEN_NAME]],
-                INTENT: [moodbot_features["intents"]["deny"]],
+                PREVIOUS_ACTION: {ACTION_NAME: ACTION_LISTEN_NAME},
+                USER: {INTENT: "goodbye"},
             },
-        ],
+        ]
     ]
+
+    assert actual_states is not None
+    assert len(actual_states) == len(expected_states)
+
+    for actual, expected in zip(actual_states, expected_states):
+        assert actual == expected
+
+
+@pytest.mark.parametrize("max_history", (None, 2))
+@pytest.mark.parametrize(
+    "scenario_id",
+    ("moodbot", "ignore_action_unlikely_intent", "keep_action_unlikely_intent"),
+)
+def test_featurize_trackers_with_max_history_tracker_featurizer(
+    moodbot_domain: Domain,
+    make_tracker_featurizer: Callable[
+        [Optional[int], bool], MaxHistoryTrackerFeaturizer
+    ],
+    max_history_scenarios: Dict[Text, MaxHistoryScenario],
+    scenario_id: Text,
+    max_history: Optional[int],
+):
+    scenario = max_history_scenarios[scenario_id]
+    tracker_featurizer = make_tracker_featurizer(max_history)
+
+    actual_features, actual_labels, entity_tags = tracker_featurizer.featurize_trackers(
+        [scenario.tracker],
+        moodbot_domain,
+        precomputations=None,
+        ignore_action_unlikely_intent=scenario.ignore_action_unlikely_intent,
+    )
+
+    expected_fingerprints = scenario.expected_fingerprints
     if max_history is not None:
-        expected_features = [x[-max_history:] for x in expected_features]
-    if not remove_duplicates:
-        expected_features = expected_features * 2
+        expected_fingerprints = [x[-max_history:] for x in expected_fingerprints]
 
     assert actual_features is not None
-    assert len(actual_features) == len(expected_features)
+    assert [_fingerprint_states(states) for states in actual_features] == list(
+        expected_fingerprints
+    )
+
+    assert actual_labels is not None
+    assert np.array_equal(actual_labels, scenario.expected_labels)
+
+    # moodbot doesn't contain e2e entities
+    assert not any(any(turn_tags) for turn_tags in entity_tags)
+
+
+@pytest.mark.parametrize(
+    "remove_duplicates,max_history",
+    ((True, None), (True, 2), (False, None), (False, 2)),
+)
+def test_deduplicate_featurize_trackers_with_max_history_tracker_featurizer(
+    moodbot_tracker: DialogueStateTracker,
+    moodbot_domain: Domain,
+    make_tracker_featurizer: Callable[
+        [Optional[int], bool], MaxHistoryTrackerFeaturizer
+    ],
+    max_history_scenarios: Dict[Text, MaxHistoryScenario],
+    remove_duplicates: bool,
+    max_history: Optional[int],
+):
+    tracker_featurizer = make_tracker_featurizer(max_history, remove_duplicates)
 
-    for actual, expected in zip(actual_features, expected_features):
-        assert compare_featurized_states(actual, expected)
+    # Add Duplicate moodbot_tracker states should get removed.
+    actual_features, actual_labels, entity_tags = tracker_featurizer.featurize_trackers(
+        [moodbot_tracker, moodbot_tracker], moodbot_domain, precomputations=None
+    )
 
-    expected_labels = np.array([[0, 17, 0, 14, 15, 0, 16]]).T
+    expected_fingerprints = max_history_scenarios["moodbot"].expected_fingerprints
+    if max_history is not None:
+        expected_fingerprints = [x[-max_history:] for x in expected_fingerprints]
     if not remove_duplicates:
-        expected_labels = np.vstack([expected_labels] * 2)
+        expected_fingerprints = expected_fingerprints * 2
+
+    assert actual_features is not None
+    assert [_fingerprint_states(states) for states in actual_features] == list(
+        expected_fingerprints
+    )
+
+    expected_labels = (
+        MOODBOT_ACTION_LABELS if remove_duplicates else MOODBOT_ACTION_LABELS_TWICE
+    )
 
     assert actual_labels is not None
-    assert actual_labels.shape == expected_labels.shape
-    assert np.all(actual_labels == expected_labels)
+    assert np.array_equal(actual_labels, expected_labels)
 
     # moodbot doesn't contain e2e entities
-    assert not any([any(turn_tags) for turn_tags in entity_tags])
+    assert not any(any(turn_tags) for turn_tags in entity_tags)
 
 
-@pytest.mark.parametrize("max_history", [None, 2])
+@pytest.mark.parametrize("max_history", (None, 2))
 def test_create_state_features_with_max_history_tracker_featurizer(
     moodbot_tracker: DialogueStateTracker,
     moodbot_domain: Domain,
@@ -1141,42 +1090,23 @@ def test_create_state_features_with_max_history_tracker_featurizer(
         expected_features = [x[-max_history:] for x in expected_features]
 
     assert actual_features is not None
-    assert len(actual_features) == len(expected_features)
+    assert compare_featurized_trackers(actual_features, expected_features)
 
-    for actual, expected in zip(actual_features, expected_features):
-        assert compare_featurized_states(actual, expected)
 
-
-@pytest.mark.parametrize("max_history", [None, 2])
+@pytest.mark.parametrize("max_history", (None, 2))
 def test_create_state_features_ignore_action_unlikely_intent_max_history_featurizer(
     moodbot_domain: Domain,
+    unlikely_intent_tracker_long: DialogueStateTracker,
     moodbot_features: Dict[Text, Dict[Text, Features]],
     max_history: Optional[int],
 ):
-    tracker = DialogueStateTracker.from_events(
-        "default",
-        [
-            ActionExecuted(ACTION_LISTEN_NAME),
-            user_uttered("greet"),
-            ActionExecuted(ACTION_UNLIKELY_INTENT_NAME),
-            ActionExecuted("utter_greet"),
-            ActionExecuted(ACTION_LISTEN_NAME),
-            user_uttered("mood_great"),
-            ActionExecuted(ACTION_UNLIKELY_INTENT_NAME),
-            ActionExecuted("utter_happy"),
-            ActionExecuted(ACTION_LISTEN_NAME),
-            user_uttered("goodbye"),
-        ],
-        domain=moodbot_domain,
-    )
-
     state_featurizer = SingleStateFeaturizer()
     tracker_featurizer = MaxHistoryTrackerFeaturizer(
         state_featurizer, max_history=max_history
     )
     state_featurizer.prepare_for_training(moodbot_domain)
     actual_features = tracker_featurizer.create_state_features(
-        [tracker],
+        [unlikely_intent_tracker_long],
         moodbot_domain,
         precomputations=None,
         ignore_action_unlikely_intent=True,
@@ -1205,42 +1135,23 @@ def test_create_state_features_ignore_action_unlikely_intent_max_history_featuri
         expected_features = [x[-max_history:] for x in expected_features]
 
     assert actual_features is not None
-    assert len(actual_features) == len(expected_features)
-
-    for actual, expected in zip(actual_features, expected_features):
-        assert compare_featurized_states(actual, expected)
+    assert compare_featurized_trackers(actual_features, expected_features)
 
 
-@pytest.mark.parametrize("max_history", [None, 2])
+@pytest.mark.parametrize("max_history", (None, 2))
 def test_create_state_features_keep_action_unlikely_intent_max_history_featurizer(
     moodbot_domain: Domain,
+    unlikely_intent_tracker_long: DialogueStateTracker,
     moodbot_features: Dict[Text, Dict[Text, Features]],
     max_history: Optional[int],
 ):
-    tracker = DialogueStateTracker.from_events(
-        "default",
-        [
-            ActionExecuted(ACTION_LISTEN_NAME),
-            user_uttered("greet"),
-            ActionExecuted(ACTION_UNLIKELY_INTENT_NAME),
-            ActionExecuted("utter_greet"),
-            ActionExecuted(ACTION_LISTEN_NAME),
-            user_uttered("mood_great"),
-            ActionExecuted(ACTION_UNLIKELY_INTENT_NAME),
-            ActionExecuted("utter_happy"),
-            ActionExecuted(ACTION_LISTEN_NAME),
-            user_uttered("goodbye"),
-        ],
-        domain=moodbot_domain,
-    )
-
     state_featurizer = SingleStateFeaturizer()
     tracker_featurizer = MaxHistoryTrackerFeaturizer(
         state_featurizer, max_history=max_history
     )
     state_featurizer.prepare_for_training(moodbot_domain)
     actual_features = tracker_featurizer.create_state_features(
-        [tracker], moodbot_domain, precomputations=None
+        [unlikely_intent_tracker_long], moodbot_domain, precomputations=None
     )
 
     expected_features = [
@@ -1268,13 +1179,10 @@ def test_create_state_features_keep_action_unlikely_intent_max_history_featurize
         expected_features = [x[-max_history:] for x in expected_features]
 
     assert actual_features is not None
-    assert len(actual_features) == len(expected_features)
+    assert compare_featurized_trackers(actual_features, expected_features)
 
-    for actual, expected in zip(actual_features, expected_features):
-        assert compare_featurized_states(actual, expected)
 
-
-@pytest.mark.parametrize("max_history", [None, 2])
+@pytest.mark.parametrize("max_history", (None, 2))
 def test_prediction_states_with_max_history_tracker_featurizer(
     moodbot_tracker: DialogueStateTracker,
     moodbot_domain: Domain,
@@ -1325,7 +1233,7 @@ def test_prediction_states_with_max_history_tracker_featurizer(
         assert actual == expected
 
 
-@pytest.mark.parametrize("max_history", [None, 2])
+@pytest.mark.parametrize("max_history", (None, 2))
 def test_prediction_states_hide_rule_states_with_max_history_tracker_featurizer(
     moodbot_tracker: DialogueStateTracker,
     moodbot_domain: Domain,
@@ -1413,10 +1321,11 @@ def test_prediction_states_hide_rule_states_with_max_history_tracker_featurizer(
         assert actual == expected
 
 
-@pytest.mark.parametrize("max_history", [None, 3])
+@pytest.mark.parametrize("max_history", (None, 3))
 def test_prediction_states_ignores_action_intent_unlikely_max_history_featurizer(
     moodbot_tracker: DialogueStateTracker,
     moodbot_domain: Domain,
+    unlikely_intent_tracker_long: DialogueStateTracker,
     max_history: Optional[int],
 ):
     state_featurizer = SingleStateFeaturizer()
@@ -1424,25 +1333,10 @@ def test_prediction_states_ignores_action_intent_unlikely_max_history_featurizer
         state_featurizer, max_history=max_history
     )
 
-    tracker = DialogueStateTracker.from_events(
-        "default",
-        [
-            ActionExecuted(ACTION_LISTEN_NAME),
-            user_uttered("greet"),
-            ActionExecuted(ACTION_UNLIKELY_INTENT_NAME),
-            ActionExecuted("utter_greet"),
-            ActionExecuted(ACTION_LISTEN_NAME),
-            user_uttered("mood_great"),
-            ActionExecuted(ACTION_UNLIKELY_INTENT_NAME),
-            ActionExecuted("utter_happy"),
-            ActionExecuted(ACTION_LISTEN_NAME),
-            user_uttered("goodbye"),
-        ],
-        domain=moodbot_domain,
-    )
-
     actual_states = tracker_featurizer.prediction_states(
-        [tracker], moodbot_domain, ignore_action_unlikely_intent=True
+        [unlikely_intent_tracker_long],
+        moodbot_domain,
+        ignore_action_unlikely_intent=True,
     )
 
     expected_states = [
@@ -1478,10 +1372,11 @@ def test_prediction_states_ignores_action_intent_unlikely_max_history_featurizer
         assert actual == expected
 
 
-@pytest.mark.parametrize("max_history", [None, 3])
+@pytest.mark.parametrize("max_history", (None, 3))
 def test_prediction_states_keeps_action_intent_unlikely_max_history_featurizer(
     moodbot_tracker: DialogueStateTracker,
     moodbot_domain: Domain,
+    unlikely_intent_tracker_long: DialogueStateTracker,
     max_history: Optional[int],
 ):
     state_featurizer = SingleStateFeaturizer()
@@ -1489,25 +1384,10 @@ def test_prediction_states_keeps_action_intent_unlikely_max_history_featurizer(
         state_featurizer, max_history=max_history
     )
 
-    tracker = DialogueStateTracker.from_events(
-        "default",
-        [
-            ActionExecuted(ACTION_LISTEN_NAME),
-            user_uttered("greet"),
-            ActionExecuted(ACTION_UNLIKELY_INTENT_NAME),
-            ActionExecuted("utter_greet"),
-            ActionExecuted(ACTION_LISTEN_NAME),
-            user_uttered("mood_great"),
-            ActionExecuted(ACTION_UNLIKELY_INTENT_NAME),
-            ActionExecuted("utter_happy"),
-            ActionExecuted(ACTION_LISTEN_NAME),
-            user_uttered("goodbye"),
-        ],
-        domain=moodbot_domain,
+    actual_states = tracker_featurizer.prediction_states(
+        [unlikely_intent_tracker_long], moodbot_domain
     )
 
-    actual_states = tracker_featurizer.prediction_states([tracker], moodbot_domain)
-
     expected_states = [
         [
             {},
@@ -1551,10 +1431,10 @@ def test_prediction_states_keeps_action_intent_unlikely_max_history_featurizer(
 
 @pytest.mark.parametrize(
     "max_history,moodbot_features",
-    [
-        [None, "IntentTokenizerSingleStateFeaturizer"],
-        [2, "IntentTokenizerSingleStateFeaturizer"],
-    ],
+    (
+        (None, "IntentTokenizerSingleStateFeaturizer"),
+        (2, "IntentTokenizerSingleStateFeaturizer"),
+    ),
     indirect=["moodbot_features"],
 )
 def test_featurize_trackers_with_intent_max_history_tracker_featurizer(
@@ -1601,53 +1481,38 @@ def test_featurize_trackers_with_intent_max_history_tracker_featurizer(
         expected_features = [x[-max_history:] for x in expected_features]
 
     assert actual_features is not None
-    assert len(actual_features) == len(expected_features)
+    assert compare_featurized_trackers(actual_features, expected_features)
 
-    for actual, expected in zip(actual_features, expected_features):
-        assert compare_featurized_states(actual, expected)
-
-    expected_labels = np.array([[5, 7, 3]]).T
+    expected_labels = MOODBOT_INTENT_LABELS
 
     assert actual_labels is not None
-    assert actual_labels.shape == expected_labels.shape
-    assert np.all(actual_labels == expected_labels)
+    assert np.array_equal(actual_labels, expected_labels)
 
     # moodbot doesn't contain e2e entities
-    assert not any([any(turn_tags) for turn_tags in entity_tags])
+    assert not any(any(turn_tags) for turn_tags in entity_tags)
 
 
 @pytest.mark.parametrize(
     "max_history, moodbot_features",
-    [
-        [None, "IntentTokenizerSingleStateFeaturizer"],
-        [2, "IntentTokenizerSingleStateFeaturizer"],
-    ],
+    (
+        (None, "IntentTokenizerSingleStateFeaturizer"),
+        (2, "IntentTokenizerSingleStateFeaturizer"),
+    ),
     indirect=["moodbot_features"],
 )
 def test_trackers_ignore_action_unlikely_intent_intent_max_history_featurizer(
     moodbot_domain: Domain,
+    unlikely_intent_tracker_short: DialogueStateTracker,
     moodbot_features: Dict[Text, Dict[Text, Features]],
     max_history: Optional[int],
 ):
-    tracker = DialogueStateTracker.from_events(
-        "default",
-        [
-            ActionExecuted(ACTION_LISTEN_NAME),
-            user_uttered("greet"),
-            ActionExecuted(ACTION_UNLIKELY_INTENT_NAME),
-            ActionExecuted("utter_greet"),
-            ActionExecuted(ACTION_LISTEN_NAME),
-            user_uttered("mood_unhappy"),
-        ],
-        domain=moodbot_domain,
-    )
     state_featurizer = IntentTokenizerSingleStateFeaturizer()
     tracker_featurizer = IntentMaxHistoryTrackerFeaturizer(
         state_featurizer, max_history=max_history
     )
 
     actual_features, actual_labels, entity_tags = tracker_featurizer.featurize_trackers(
-        [tracker],
+        [unlikely_intent_tracker_short],
         moodbot_domain,
         precomputations=None,
         ignore_action_unlikely_intent=True,
@@ -1669,52 +1534,36 @@ def test_trackers_ignore_action_unlikely_intent_intent_max_history_featurizer(
         expected_features = [x[-max_history:] for x in expected_features]
 
     assert actual_features is not None
-    assert len(actual_features) == len(expected_features)
+    assert compare_featurized_trackers(actual_features, expected_features)
 
-    for actual, expected in zip(actual_features, expected_features):
-        assert compare_featurized_states(actual, expected)
-
-    expected_labels = np.array([[5, 7]]).T
-    assert actual_labels.shape == expected_labels.shape
-    for actual, expected in zip(actual_labels, expected_labels):
-        assert np.all(actual == expected)
+    expected_labels = UNLIKELY_INTENT_INTENT_LABELS
+    assert np.array_equal(actual_labels, expected_labels)
 
     # moodbot doesn't contain e2e entities
-    assert not any([any(turn_tags) for turn_tags in entity_tags])
+    assert not any(any(turn_tags) for turn_tags in entity_tags)
 
 
 @pytest.mark.parametrize(
     "max_history,moodbot_features",
-    [
-        [None, "IntentTokenizerSingleStateFeaturizer"],
-        [2, "IntentTokenizerSingleStateFeaturizer"],
-    ],
+    (
+        (None, "IntentTokenizerSingleStateFeaturizer"),
+        (2, "IntentTokenizerSingleStateFeaturizer"),
+    ),
     indirect=["moodbot_features"],
 )
 def test_trackers_keep_action_unlikely_intent_intent_max_history_featurizer(
     moodbot_domain: Domain,
+    unlikely_intent_tracker_short: DialogueStateTracker,
     moodbot_features: Dict[Text, Dict[Text, Features]],
     max_history: Optional[int],
 ):
-    tracker = DialogueStateTracker.from_events(
-        "default",
-        [
-            ActionExecuted(ACTION_LISTEN_NAME),
-            user_uttered("greet"),
-            ActionExecuted(ACTION_UNLIKELY_INTENT_NAME),
-            ActionExecuted("utter_greet"),
-            ActionExecuted(ACTION_LISTEN_NAME),
-            user_uttered("mood_unhappy"),
-        ],
-        domain=moodbot_domain,
-    )
     state_featurizer = IntentTokenizerSingleStateFeaturizer()
     tracker_featurizer = IntentMaxHistoryTrackerFeaturizer(
         state_featurizer, max_history=max_history
     )
 
     actual_features, actual_labels, entity_tags = tracker_featurizer.featurize_trackers(
-        [tracker], moodbot_domain, precomputations=None
+        [unlikely_intent_tracker_short], moodbot_domain, precomputations=None
     )
 
     expected_features = [
@@ -1733,30 +1582,24 @@ def test_trackers_keep_action_unlikely_intent_intent_max_history_featurizer(
         expected_features = [x[-max_history:] for x in expected_features]
 
     assert actual_features is not None
-    assert len(actual_features) == len(expected_features)
+    assert compare_featurized_trackers(actual_features, expected_features)
 
-    for actual, expected in zip(actual_features, expected_features):
-        assert compare_featurized_states(actual, expected)
-
-    expected_labels = np.array([[5, 7]]).T
+    expected_labels = UNLIKELY_INTENT_INTENT_LABELS
     assert actual_labels is not None
-    assert actual_labels.shape == expected_labels.shape
-
-    for actual, expected in zip(actual_labels, expected_labels):
-        assert np.all(actual == expected)
+    assert np.array_equal(actual_labels, expected_labels)
 
     # moodbot doesn't contain e2e entities
-    assert not any([any(turn_tags) for turn_tags in entity_tags])
+    assert not any(any(turn_tags) for turn_tags in entity_tags)
 
 
 @pytest.mark.parametrize(
     "remove_duplicates,max_history,moodbot_features",
-    [
-        [True, None, "IntentTokenizerSingleStateFeaturizer"],
-        [True, 2, "IntentTokenizerSingleStateFeaturizer"],
-        [False, None, "IntentTokenizerSingleStateFeaturizer"],
-        [False, 2, "IntentTokenizerSingleStateFeaturizer"],
-    ],
+    (
+        (True, None, "IntentTokenizerSingleStateFeaturizer"),
+        (True, 2, "IntentTokenizerSingleStateFeaturizer"),
+        (False, None, "IntentTokenizerSingleStateFeaturizer"),
+        (False, 2, "IntentTokenizerSingleStateFeaturizer"),
+    ),
     indirect=["moodbot_features"],
 )
 def test_deduplicate_featurize_trackers_with_intent_max_history_tracker_featurizer(
@@ -1808,29 +1651,25 @@ def test_deduplicate_featurize_trackers_with_intent_max_history_tracker_featuriz
         expected_features = expected_features * 2
 
     assert actual_features is not None
-    assert len(actual_features) == len(expected_features)
+    assert compare_featurized_trackers(actual_features, expected_features)
 
-    for actual, expected in zip(actual_features, expected_features):
-        assert compare_featurized_states(actual, expected)
-
-    expected_labels = np.array([[5, 7, 3]]).T
-    if not remove_duplicates:
-        expected_labels = np.vstack([expected_labels] * 2)
+    expected_labels = (
+        MOODBOT_INTENT_LABELS if remove_duplicates else MOODBOT_INTENT_LABELS_TWICE
+    )
 
     assert actual_labels is not None
-    assert actual_labels.shape == expected_labels.shape
-    assert np.all(actual_labels == expected_labels)
+    assert np.array_equal(actual_labels, expected_labels)
 
     # moodbot doesn't contain e2e entities
-    assert not any([any(turn_tags) for turn_tags in entity_tags])
+    assert not any(any(turn_tags) for turn_tags in entity_tags)
 
 
 @pytest.mark.parametrize(
     "max_history,moodbot_features",
-    [
-        [None, "IntentTokenizerSingleStateFeaturizer"],
-        [2, "IntentTokenizerSingleStateFeaturizer"],
-    ],
+    (
+        (None, "IntentTokenizerSingleStateFeaturizer"),
+        (2, "IntentTokenizerSingleStateFeaturizer"),
+    ),
     indirect=["moodbot_features"],
 )
 def test_create_state_features_with_intent_max_history_tracker_featurizer(
@@ -1875,48 +1714,30 @@ def test_create_state_features_with_intent_max_history_tracker_featurizer(
         expected_features = [x[-max_history:] for x in expected_features]
 
     assert actual_features is not None
-    assert len(actual_features) == len(expected_features)
-
-    for actual, expected in zip(actual_features, expected_features):
-        assert compare_featurized_states(actual, expected)
+    assert compare_featurized_trackers(actual_features, expected_features)
 
 
 @pytest.mark.parametrize(
     "max_history,moodbot_features",
-    [
-        [None, "IntentTokenizerSingleStateFeaturizer"],
-        [2, "IntentTokenizerSingleStateFeaturizer"],
-    ],
+    (
+        (None, "IntentTokenizerSingleStateFeaturizer"),
+        (2, "IntentTokenizerSingleStateFeaturizer"),
+    ),
     indirect=["moodbot_features"],
 )
 def test_state_features_ignore_action_unlikely_intent_intent_max_history_featurizer(
     moodbot_domain: Domain,
+    unlikely_intent_tracker_long: DialogueStateTracker,
     moodbot_features: Dict[Text, Dict[Text, Features]],
     max_history: Optional[int],
 ):
-    tracker = DialogueStateTracker.from_events(
-        "default",
-        [
-            ActionExecuted(ACTION_LISTEN_NAME),
-            user_uttered("greet"),
-            ActionExecuted(ACTION_UNLIKELY_INTENT_NAME),
-            ActionExecuted("utter_greet"),
-            ActionExecuted(ACTION_LISTEN_NAME),
-            user_uttered("mood_great"),
-            ActionExecuted(ACTION_UNLIKELY_INTENT_NAME),
-            ActionExecuted("utter_happy"),
-            ActionExecuted(ACTION_LISTEN_NAME),
-            user_uttered("goodbye"),
-        ],
-        domain=moodbot_domain,
-    )
     state_featurizer = IntentTokenizerSingleStateFeaturizer()
     tracker_featurizer = IntentMaxHistoryTrackerFeaturizer(
         state_featurizer, max_history=max_history
     )
     state_featurizer.prepare_for_training(moodbot_domain)
     actual_features = tracker_featurizer.create_state_features(
-        [tracker],
+        [unlikely_intent_tracker_long],
         moodbot_domain,
         precomputations=None,
         ignore_action_unlikely_intent=True,
@@ -1941,48 +1762,30 @@ def test_state_features_ignore_action_unlikely_intent_intent_max_history_featuri
         expected_features = [x[-max_history:] for x in expected_features]
 
     assert actual_features is not None
-    assert len(actual_features) == len(expected_features)
-
-    for actual, expected in zip(actual_features, expected_features):
-        assert compare_featurized_states(actual, expected)
+    assert compare_featurized_trackers(actual_features, expected_features)
 
 
 @pytest.mark.parametrize(
     "max_history,moodbot_features",
-    [
-        [None, "IntentTokenizerSingleStateFeaturizer"],
-        [2, "IntentTokenizerSingleStateFeaturizer"],
-    ],
+    (
+        (None, "IntentTokenizerSingleStateFeaturizer"),
+        (2, "IntentTokenizerSingleStateFeaturizer"),
+    ),
     indirect=["moodbot_features"],
 )
 def test_state_features_keep_action_unlikely_intent_intent_max_history_featurizer(
     moodbot_domain: Domain,
+    unlikely_intent_tracker_long: DialogueStateTracker,
     moodbot_features: Dict[Text, Dict[Text, Features]],
     max_history: Optional[int],
 ):
-    tracker = DialogueStateTracker.from_events(
-        "default",
-        [
-            ActionExecuted(ACTION_LISTEN_NAME),
-            user_uttered("greet"),
-            ActionExecuted(ACTION_UNLIKELY_INTENT_NAME),
-            ActionExecuted("utter_greet"),
-            ActionExecuted(ACTION_LISTEN_NAME),
-            user_uttered("mood_great"),
-            ActionExecuted(ACTION_UNLIKELY_INTENT_NAME),
-            ActionExecuted("utter_happy"),
-            ActionExecuted(ACTION_LISTEN_NAME),
-            user_uttered("goodbye"),
-        ],
-        domain=moodbot_domain,
-    )
     state_featurizer = IntentTokenizerSingleStateFeaturizer()
     tracker_featurizer = IntentMaxHistoryTrackerFeaturizer(
         state_featurizer, max_history=max_history
     )
     state_featurizer.prepare_for_training(moodbot_domain)
     actual_features = tracker_featurizer.create_state_features(
-        [tracker], moodbot_domain, precomputations=None
+        [unlikely_intent_tracker_long], moodbot_domain, precomputations=None
     )
 
     expected_features = [
@@ -2007,13 +1810,10 @@ def test_state_features_keep_action_unlikely_intent_intent_max_history_featurize
         expected_features = [x[-max_history:] for x in expected_features]
 
     assert actual_features is not None
-    assert len(actual_features) == len(expected_features)
-
-    for actual, expected in zip(actual_features, expected_features):
-        assert compare_featurized_states(actual, expected)
+    assert compare_featurized_trackers(actual_features, expected_features)
 
 
-@pytest.mark.parametrize("max_history", [None, 2])
+@pytest.mark.parametrize("max_history", (None, 2))
 def test_prediction_states_with_intent_max_history_tracker_featurizer(
     moodbot_tracker: DialogueStateTracker,
     moodbot_domain: Domain,
@@ -2066,7 +1866,7 @@ def test_prediction_states_with_intent_max_history_tracker_featurizer(
         assert actual == expected
 
 
-@pytest.mark.parametrize("max_history", [None, 2])
+@pytest.mark.parametrize("max_history", (None, 2))
 def test_prediction_states_hide_rule_states_intent_max_history_featurizer(
     moodbot_tracker: DialogueStateTracker,
     moodbot_domain: Domain,
@@ -2125,10 +1925,11 @@ def test_prediction_states_hide_rule_states_intent_max_history_featurizer(
         assert actual == expected
 
 
-@pytest.mark.parametrize("max_history", [None, 3])
+@pytest.mark.parametrize("max_history", (None, 3))
 def test_prediction_states_ignores_action_intent_unlikely_intent_max_history_featurizer(
     moodbot_tracker: DialogueStateTracker,
     moodbot_domain: Domain,
+    unlikely_intent_tracker_long: DialogueStateTracker,
     max_history: Optional[int],
 ):
     state_featurizer = IntentTokenizerSingleStateFeaturizer()
@@ -2136,25 +1937,10 @@ def test_prediction_states_ignores_action_intent_unlikely_intent_max_history_fea
         state_featurizer, max_history=max_history
     )
 
-    tracker = DialogueStateTracker.from_events(
-        "default",
-        [
-            ActionExecuted(ACTION_LISTEN_NAME),
-            user_uttered("greet"),
-            ActionExecuted(ACTION_UNLIKELY_INTENT_NAME),
-            ActionExecuted("utter_greet"),
-            ActionExecuted(ACTION_LISTEN_NAME),
-            user_uttered("mood_great"),
-            ActionExecuted(ACTION_UNLIKELY_INTENT_NAME),
-            ActionExecuted("utter_happy"),
-            ActionExecuted(ACTION_LISTEN_NAME),
-            user_uttered("goodbye"),
-        ],
-        domain=moodbot_domain,
-    )
-
     actual_states = tracker_featurizer.prediction_states(
-        [tracker], moodbot_domain, ignore_action_unlikely_intent=True
+        [unlikely_intent_tracker_long],
+        moodbot_domain,
+        ignore_action_unlikely_intent=True,
     )
 
     expected_states = [
@@ -2186,10 +1972,11 @@ def test_prediction_states_ignores_action_intent_unlikely_intent_max_history_fea
         assert actual == expected
 
 
-@pytest.mark.parametrize("max_history", [None, 3])
+@pytest.mark.parametrize("max_history", (None, 3))
 def test_prediction_states_keeps_action_intent_unlikely_intent_max_history_featurizer(
     moodbot_tracker: DialogueStateTracker,
     moodbot_domain: Domain,
+    unlikely_intent_tracker_long: DialogueStateTracker,
     max_history: Optional[int],
 ):
     state_featurizer = IntentTokenizerSingleStateFeaturizer()
@@ -2197,25 +1984,10 @@ def test_prediction_states_keeps_action_intent_unlikely_intent_max_history_featu
         state_featurizer, max_history=max_history
     )
 
-    tracker = DialogueStateTracker.from_events(
-        "default",
-        [
-            ActionExecuted(ACTION_LISTEN_NAME),
-            user_uttered("greet"),
-            ActionExecuted(ACTION_UNLIKELY_INTENT_NAME),
-            ActionExecuted("utter_greet"),
-            ActionExecuted(ACTION_LISTEN_NAME),
-            user_uttered("mood_great"),
-            ActionExecuted(ACTION_UNLIKELY_INTENT_NAME),
-            ActionExecuted("utter_happy"),
-            ActionExecuted(ACTION_LISTEN_NAME),
-            user_uttered("goodbye"),
-        ],
-        domain=moodbot_domain,
+    actual_states = tracker_featurizer.prediction_states(
+        [unlikely_intent_tracker_long], moodbot_domain
     )
 
-    actual_states = tracker_featurizer.prediction_states([tracker], moodbot_domain)
-
     expected_states = [
         [
             {},
@@ -2255,7 +2027,7 @@ def test_prediction_states_keeps_action_intent_unlikely_intent_max_history_featu
 
 @pytest.mark.parametrize(
     "remove_duplicates, max_history",
-    [[True, None], [True, 2], [False, None], [False, 2]],
+    ((True, None), (True, 2), (False, None), (False, 2)),
 )
 def test_multilabels_with_intent_max_history_tracker_featurizer(
     moodbot_domain: Domain, max_history: Optional[int], remove_duplicates: bool